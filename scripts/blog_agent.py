@@ -3,10 +3,23 @@
 Blog Agent - Gerador automático de posts para o blog Desbravando Rust
 """
 
-import os, re, json
+from __future__ import annotations
+
+import os, re, json, time, argparse, hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from github import Github, GithubException
-from huggingface_hub import InferenceClient
+from typing import TYPE_CHECKING
+
+# github, huggingface_hub e requests custam centenas de ms para importar
+# (urllib3, pydantic...): são importados só dentro das funções que os usam
+if TYPE_CHECKING:
+    import requests
+    from huggingface_hub import InferenceClient
+
+try:
+    import orjson  # opcional: (de)serialização JSON em Rust, bem mais rápida
+except ImportError:
+    orjson = None
 
 # ─────────────────────────────────────────────────────────────
 # CONFIGURAÇÕES
@@ -20,6 +33,19 @@ POSTS_SECTION       = "## Últimos posts:"
 MAIN_BRANCH         = "main"
 POST_FILENAME       = "README.md"
 MODEL_ID            = os.environ.get("MODEL_ID") or "deepseek-ai/DeepSeek-V3-0324"
+FETCH_WORKERS       = 16  # leituras de posts em paralelo (I/O de rede, GIL liberado)
+RAW_BASE_URL        = "https://raw.githubusercontent.com"
+TITLE_PREFIX_BYTES  = 2048  # o título está sempre no topo do README
+HTTP_TIMEOUT        = 60
+CACHE_DIR           = os.environ.get("BLOG_AGENT_CACHE_DIR") or os.path.expanduser("~/.cache/blog_agent")
+POSTS_CACHE_FILE    = os.path.join(CACHE_DIR, "posts.json")
+LLM_CACHE_DIR       = os.path.join(CACHE_DIR, "llm")
+LLM_CACHE_TTL       = 24 * 3600  # segundos
+LLM_CACHE_ENABLED   = not os.environ.get("BLOG_AGENT_NO_CACHE")  # ou --no-cache
+
+_LEADING_NUM    = re.compile(r"^(\d+)")
+_MD_FENCE_OPEN  = re.compile(r"^```(?:json)?\n?")
+_MD_FENCE_CLOSE = re.compile(r"\n?```$")
 
 # FIX: int(None) lança TypeError, não ValueError — helper dedicado
 def _parse_int_env(key: str, default: int) -> int:
@@ -39,6 +65,88 @@ O blog serve como material de apoio para o livro 'Desbravando Rust'.
 Escreva SEMPRE em PT-BR, com linguagem acessível e didática.
 """.strip()
 
+# FIX: ']' estava faltando para fechar o array "outline"
+TOPIC_SCHEMA = """
+{
+  "title": "Título do post em PT-BR",
+  "slug": "slug-curto-kebab-case",
+  "description": "Uma frase descrevendo o post",
+  "tags": ["tag1", "tag2", "tag3"],
+  "outline": [
+    "Introdução: ...",
+    "Seção 1: ...",
+    "Seção 2: ...",
+    "Comparação com Python: ...",
+    "Conclusão: ..."
+  ]
+}""".strip()
+
+TOPIC_TASK = f"""
+## Tarefa:
+Sugira o PRÓXIMO post com progressão lógica de aprendizado de Rust para quem vem do Python.
+NÃO repita temas já publicados (listados pelo usuário). Seja específico.
+
+Responda SOMENTE com JSON válido (sem blocos de código markdown):
+{TOPIC_SCHEMA}""".strip()
+
+# FIX: removida regra #12 (pedir ao LLM para atualizar README — impossível)
+POST_RULES = """
+## Regras de escrita:
+1. Mínimo de 1500 palavras — prefira mais
+2. Linguagem acessível para iniciantes em Rust com background Python
+3. Introduza cada conceito com analogia ou contexto antes do código
+4. Blocos ```rust extensos, comentados linha a linha em PT-BR
+5. Compare SEMPRE com Python (```python) — mesmo problema nas duas linguagens
+6. Use subtítulos (##, ###) para organizar bem o conteúdo
+7. Seção "## O que aprendemos" ao final com bullet points dos conceitos
+8. Ao menos um exemplo prático completo e funcional, não apenas fragmentos
+9. Emojis com moderação nos títulos para deixar mais amigável
+10. Explique os erros mais comuns de quem vem do Python nesse tema
+11. Finalize com chamada para compra do livro com link já em markdowon [desbravandorust.com.br
+](https://desbravandorust.com.br)
+12. Não utilize emojis ou emoticons""".strip()
+
+# Só vale para a chamada separada do post: no modo fundido o formato é o das
+# seções com marcadores (FUSED_TASK), e o "sem `---`" contradiria os marcadores
+POST_FORMAT = """
+## Formato de saída:
+Markdown puro, iniciando diretamente com o título do post como `# Título`.
+Sem frontmatter, sem `---`, sem bloco de metadados.""".strip()
+
+POST_TASK = f"{POST_RULES}\n\n{POST_FORMAT}"
+
+# Tema + post numa resposta só (1 round-trip em vez de 2)
+FUSED_JSON_MARKER = "---FRONTMATTER_JSON---"
+FUSED_POST_MARKER = "---POST_MARKDOWN---"
+FUSED_TASK = f"""
+## Tarefa:
+1. Escolha o PRÓXIMO post com progressão lógica de aprendizado de Rust para quem vem do Python.
+   NÃO repita temas já publicados (listados pelo usuário). Seja específico.
+2. Escreva o post completo seguindo as regras abaixo.
+
+{POST_RULES}
+
+## Formato da resposta (exatamente duas seções, nesta ordem):
+{FUSED_JSON_MARKER}
+{TOPIC_SCHEMA}
+{FUSED_POST_MARKER}
+# Título do post
+...conteúdo em markdown...
+
+Os marcadores {FUSED_JSON_MARKER} e {FUSED_POST_MARKER} são as únicas linhas com `---`.""".strip()
+
+
+# INVARIANTE DE CACHE: o provedor só reaproveita o prefill se o começo do
+# prompt for byte a byte igual entre chamadas. Por isso a ordem é sempre
+# [system=BLOG_CONTEXT, system=regras fixas, user=estado dinâmico] — nada que
+# mude por chamada (lista de posts, tema, outline, data) entra nos system.
+def build_messages(task_rules: str, dynamic: str) -> list:
+    return [
+        {"role": "system", "content": BLOG_CONTEXT},
+        {"role": "system", "content": task_rules},
+        {"role": "user",   "content": dynamic},
+    ]
+
 
 # ─────────────────────────────────────────────────────────────
 # 1. ABSORVER CONTEXTO EXISTENTE
@@ -53,37 +161,260 @@ def extract_title(content: str, fallback: str) -> str:
     return fallback
 
 
-def get_existing_posts(repo) -> list:
-    posts = []
+def _read_title(session, repo, ref: str, path: str, dirname: str):
+    """Lê só o começo do README.md do post (Range) no raw.githubusercontent —
+    o título está nas primeiras linhas. Se ele não couber na fatia, baixa o
+    arquivo inteiro; se o raw não responder, volta para a API do GitHub."""
+    import requests
+    from github import GithubException
+
+    url = f"{RAW_BASE_URL}/{repo.full_name}/{ref}/{path}"
+    try:
+        resp = session.get(url, headers={"Range": f"bytes=0-{TITLE_PREFIX_BYTES - 1}"}, timeout=HTTP_TIMEOUT)
+        if resp.status_code == 206:
+            head = resp.content.decode("utf-8", errors="ignore")
+            # descarta a última linha, que pode ter sido cortada no meio
+            if title := extract_title(head[:head.rfind("\n") + 1], ""):
+                return {"dirname": dirname, "title": title}
+            resp = session.get(url, timeout=HTTP_TIMEOUT)
+        if resp.status_code == 200:
+            return {"dirname": dirname, "title": extract_title(resp.text, dirname)}
+    except requests.RequestException:
+        pass
+
+    # Fallback (ex.: GitHub Enterprise sem raw.githubusercontent)
     try:
-        items = repo.get_contents(POSTS_DIR)
+        f = repo.get_contents(path, ref=ref)
     except GithubException:
+        return None
+    return {"dirname": dirname, "title": extract_title(f.decoded_content.decode("utf-8"), dirname)}
+
+
+def make_session() -> requests.Session:
+    """Session com keep-alive e um pool do tamanho do FETCH_WORKERS — com o
+    pool padrão (10) as threads excedentes abririam conexões TCP+TLS novas."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS))
+    session.headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    return session
+
+
+def _json_loads(raw):
+    """json.loads via orjson quando disponível (erros continuam ValueError)."""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _json_dumps(obj) -> bytes:
+    """JSON compacto em UTF-8 — mesma saída com ou sem orjson."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _load_posts_cache() -> dict:
+    try:
+        with open(POSTS_CACHE_FILE, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_posts_cache(cache: dict):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{POSTS_CACHE_FILE}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_json_dumps(cache))
+        os.replace(tmp, POSTS_CACHE_FILE)
+    except OSError as e:
+        print(f"  ⚠️  Não foi possível salvar o cache de posts: {e}")
+
+
+def get_existing_posts(repo) -> tuple:
+    """Lista os posts publicados na MAIN_BRANCH.
+
+    Retorna (posts, dirnames): `posts` só tem os posts cujo título foi lido;
+    `dirnames` tem todos os diretórios de post da árvore (ordenados), mesmo
+    os que falharam — é dele que sai a próxima numeração.
+
+    Usa um cache local (POSTS_CACHE_FILE) entre execuções: se o commit da
+    branch não mudou, nada é lido do GitHub; senão, só os READMEs cujo blob
+    SHA mudou são baixados de novo."""
+    from github import GithubException
+
+    try:
+        head_sha = repo.get_branch(MAIN_BRANCH).commit.sha
+    except GithubException:
+        print(f"  ⚠️  Branch '{MAIN_BRANCH}' não encontrada. Iniciando do zero.")
+        return [], []
+
+    cache = _load_posts_cache()
+    if cache.get("commit") == head_sha and "dirnames" in cache:
+        return cache["posts"], cache["dirnames"]
+
+    # 1 chamada à API lista a árvore inteira; os READMEs vêm do CDN (raw), sem
+    # gastar rate limit da API com um get_contents por post
+    tree = repo.get_git_tree(head_sha, recursive=True)
+
+    readmes = {}
+    for entry in tree.tree:
+        parts = entry.path.split("/")
+        if entry.type == "blob" and len(parts) == 3 and parts[0] == POSTS_DIR and parts[2] == POST_FILENAME:
+            readmes[parts[1]] = entry
+    if not readmes:
         print(f"  ⚠️  Diretório '{POSTS_DIR}' não encontrado. Iniciando do zero.")
-        return posts
+        return [], []
+
+    # Chave por caminho + blob SHA: mesmo conteúdo no mesmo lugar = mesmo título.
+    # O tamanho (bytes) vem de graça na árvore e serve para estimar max_tokens.
+    cached_blobs = cache.get("blobs", {})
+    blobs = {}
+    pending = {}
+    for dirname, entry in readmes.items():
+        key = f"{entry.path}@{entry.sha}"
+        if key in cached_blobs:
+            blobs[key] = {**cached_blobs[key], "size": entry.size}
+        else:
+            pending[key] = (dirname, entry)
+
+    if pending:
+        with make_session() as session, ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            futures = {
+                pool.submit(_read_title, session, repo, head_sha, entry.path, dirname): key
+                for key, (dirname, entry) in pending.items()
+            }
+            for fut in as_completed(futures):
+                if post := fut.result():
+                    key = futures[fut]
+                    blobs[key] = {**post, "size": pending[key][1].size}
+
+    posts    = sorted(blobs.values(), key=lambda p: p["dirname"])
+    dirnames = sorted(readmes)
+    cache    = {"posts": posts, "dirnames": dirnames, "blobs": blobs}
+    if len(blobs) < len(readmes):
+        # Algum README falhou: a lista está incompleta, então não vale para o
+        # commit inteiro — a próxima execução relista e tenta só os que faltam
+        print(f"  ⚠️  {len(readmes) - len(blobs)} post(s) sem título lido")
+    else:
+        cache["commit"] = head_sha
+    _save_posts_cache(cache)
+    return posts, dirnames
+
+
+def estimate_content_max_tokens(posts: list) -> int:
+    """max_tokens para o corpo do post: p95 do tamanho dos posts publicados
+    (~4 caracteres por token) com 30% de folga, limitado a CONTENT_MAX_TOKENS.
+    O decode é linear no número de tokens, então não faz sentido reservar
+    mais do que um post real costuma usar."""
+    sizes = sorted(p["size"] for p in posts if p.get("size"))
+    if not sizes:
+        return CONTENT_MAX_TOKENS
+    p95 = sizes[min(len(sizes) - 1, int(len(sizes) * 0.95))]
+    return min(CONTENT_MAX_TOKENS, int(p95 / 4 * 1.3))
+
+
+def get_next_number(dirnames: list) -> int:
+    """get_existing_posts devolve os diretórios ordenados e a numeração tem
+    zeros à esquerda, então o maior número é o do último diretório numerado."""
+    for dirname in reversed(dirnames):
+        if dirname[:1].isdigit() and (m := _LEADING_NUM.match(dirname)):
+            return int(m.group(1)) + 1
+    return 1
+
+
+def _llm_cache_path(messages: list, max_tokens: int, temperature: float) -> str:
+    key = hashlib.blake2b(
+        _json_dumps([MODEL_ID, temperature, max_tokens, messages]), digest_size=16
+    ).hexdigest()
+    return os.path.join(LLM_CACHE_DIR, f"{key}.json")
+
 
-    for item in sorted(items, key=lambda x: x.name):
-        if item.type != "dir":
+def _llm_cache_get(path: str):
+    try:
+        with open(path, "rb") as f:
+            entry = _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("created", 0) > LLM_CACHE_TTL:
+        return None
+    return entry.get("text")
+
+
+def _llm_cache_put(path: str, text: str):
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_json_dumps({"created": time.time(), "text": text}))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"  ⚠️  Não foi possível salvar o cache do LLM: {e}")
+
+
+def stream_completion(client: InferenceClient, messages: list, max_tokens: int,
+                      temperature: float, until=None, validate=None) -> tuple:
+    """Consome a resposta do LLM em streaming e devolve (texto, truncado).
+
+    `truncado` é True quando o modelo parou por bater em max_tokens
+    (finish_reason == "length") — resposta cortada nunca vai para o cache.
+
+    `until(texto_parcial)` é chamado a cada pedaço até devolver True — serve
+    para disparar trabalho (ex.: criar a branch) assim que o começo da resposta
+    basta, em vez de esperar todo o decode.
+
+    Respostas ficam em cache por LLM_CACHE_TTL, chaveadas pelo prompt exato.
+    A lista de posts publicados está no prompt, então o cache só acerta
+    quando nada foi publicado desde a última execução — rodar de novo (ex.:
+    retry no CI depois de falhar ao abrir o PR) não paga nem gera tudo outra
+    vez, e um post novo no repo já muda a chave.
+    `validate(texto)` levanta ValueError se a resposta não serve: resposta
+    inválida (truncada, JSON quebrado) nunca entra no cache nem sai dele."""
+    cache_path = None
+    if LLM_CACHE_ENABLED:
+        cache_path = _llm_cache_path(messages, max_tokens, temperature)
+        if (cached := _llm_cache_get(cache_path)) is not None and _is_valid(cached, validate):
+            print("   ♻️  Resposta reaproveitada do cache")
+            if until:
+                until(cached)
+            return cached, False
+
+    parts = []
+    finish_reason = None
+    stream = client.chat.completions.create(
+        model=MODEL_ID,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+    )
+    for chunk in stream:
+        if not chunk.choices:
             continue
-        try:
-            f = repo.get_contents(f"{POSTS_DIR}/{item.name}/{POST_FILENAME}")
-            raw = f.decoded_content.decode("utf-8")
-            posts.append({
-                "dirname": item.name,
-                "title":   extract_title(raw, item.name),
-            })
-        except GithubException:
-            pass
-
-    return posts
-
-
-def get_next_number(posts: list) -> int:
-    numbers = [
-        int(m.group(1))
-        for p in posts
-        if (m := re.match(r"^(\d+)", p["dirname"]))
-    ]
-    return max(numbers, default=0) + 1
+        finish_reason = chunk.choices[0].finish_reason or finish_reason
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        parts.append(delta)
+        if until and until("".join(parts)):
+            until = None
+    text = "".join(parts).strip()
+    truncated = finish_reason == "length"
+    if cache_path and text and not truncated and _is_valid(text, validate):
+        _llm_cache_put(cache_path, text)
+    return text, truncated
+
+
+def _is_valid(text: str, validate) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(text)
+    except ValueError:
+        return False
+    return True
 
 
 # ─────────────────────────────────────────────────────────────
@@ -96,55 +427,49 @@ def choose_next_topic(posts: list, client: InferenceClient) -> dict:
         for p in posts
     ) or "Nenhum post publicado ainda."
 
-    # FIX: ']' estava faltando para fechar o array "outline"
-    prompt = f"""{BLOG_CONTEXT}
-
-## Posts já publicados:
-{topics_list}
-
-## Tarefa:
-Sugira o PRÓXIMO post com progressão lógica de aprendizado de Rust para quem vem do Python.
-NÃO repita temas acima. Seja específico.
-
-Responda SOMENTE com JSON válido (sem blocos de código markdown):
-{{
-  "title": "Título do post em PT-BR",
-  "slug": "slug-curto-kebab-case",
-  "description": "Uma frase descrevendo o post",
-  "tags": ["tag1", "tag2", "tag3"],
-  "outline": [
-    "Introdução: ...",
-    "Seção 1: ...",
-    "Seção 2: ...",
-    "Comparação com Python: ...",
-    "Conclusão: ..."
-  ]
-}}"""
+    user = f"""## Posts já publicados:
+{topics_list}"""
 
-    resp = client.chat.completions.create(
-        model=MODEL_ID,
-        messages=[{"role": "user", "content": prompt}],
+    raw, _ = stream_completion(
+        client,
+        build_messages(TOPIC_TASK, user),
         max_tokens=THEME_MAX_TOKENS,
         temperature=0.7,
+        validate=parse_topic,
     )
-    raw = resp.choices[0].message.content.strip()
-    raw = re.sub(r"^```(?:json)?\n?", "", raw)
-    raw = re.sub(r"\n?```$", "", raw)
-    return json.loads(raw)
+    return parse_topic(raw)
+
+
+def parse_topic(raw: str) -> dict:
+    """Lê o JSON do tema; levanta ValueError se não for um objeto com
+    title, slug, description e tags preenchidos — o resto do fluxo indexa
+    esses campos direto."""
+    raw = raw.strip()
+    raw = _MD_FENCE_OPEN.sub("", raw)
+    raw = _MD_FENCE_CLOSE.sub("", raw)
+    topic = _json_loads(raw)
+    if not isinstance(topic, dict):
+        raise ValueError("tema não é um objeto JSON")
+    missing = [k for k in ("title", "slug", "description", "tags") if not topic.get(k)]
+    if missing:
+        raise ValueError(f"tema sem {', '.join(missing)}")
+    return topic
 
 
 # ─────────────────────────────────────────────────────────────
 # 3. GERAR O CONTEÚDO DO POST
 # ─────────────────────────────────────────────────────────────
 
-def generate_post_content(topic: dict, posts: list, client: InferenceClient) -> str:
+def generate_post_content(topic: dict, posts: list, client: InferenceClient) -> tuple:
+    """Escreve o post e devolve (conteúdo, truncado).
+
+    O limite de tokens sai do p95 dos posts publicados; se o modelo bater
+    nele, gera de novo com CONTENT_MAX_TOKENS. `truncado` só é True se nem
+    o teto cheio bastou."""
     recent_titles = "\n".join(f"- {p['title']}" for p in posts[-5:]) or "Nenhum ainda."
     outline = "\n".join(f"  - {s}" for s in topic.get("outline", []))
 
-    # FIX: removida regra #12 (pedir ao LLM para atualizar README — impossível)
-    prompt = f"""{BLOG_CONTEXT}
-
-## Contexto (últimos posts publicados):
+    user = f"""## Contexto (últimos posts publicados):
 {recent_titles}
 
 ## Post a ser escrito:
@@ -156,93 +481,183 @@ Tags: {', '.join(topic['tags'])}
 Outline:
 {outline}
 
-## Regras de escrita:
-1. Mínimo de 1500 palavras — prefira mais
-2. Linguagem acessível para iniciantes em Rust com background Python
-3. Introduza cada conceito com analogia ou contexto antes do código
-4. Blocos ```rust extensos, comentados linha a linha em PT-BR
-5. Compare SEMPRE com Python (```python) — mesmo problema nas duas linguagens
-6. Use subtítulos (##, ###) para organizar bem o conteúdo
-7. Seção "## O que aprendemos" ao final com bullet points dos conceitos
-8. Ao menos um exemplo prático completo e funcional, não apenas fragmentos
-9. Emojis com moderação nos títulos para deixar mais amigável
-10. Explique os erros mais comuns de quem vem do Python nesse tema
-11. Finalize com chamada para compra do livro com link já em markdowon [desbravandorust.com.br
-](https://desbravandorust.com.br)
-12. Não utilize emojis ou emoticons
+Comece com:
 
-## Formato de saída:
-Markdown puro, iniciando diretamente com o título:
+# {topic['title']}"""
 
-# {topic['title']}
+    messages   = build_messages(POST_TASK, user)
+    max_tokens = estimate_content_max_tokens(posts)
+    # FIX: era client.chat_completion() — API antiga e removida
+    content, truncated = stream_completion(client, messages, max_tokens=max_tokens, temperature=0.75)
+    if truncated and max_tokens < CONTENT_MAX_TOKENS:
+        print(f"   ⚠️  Post cortado em {max_tokens} tokens, gerando de novo com {CONTENT_MAX_TOKENS}")
+        content, truncated = stream_completion(
+            client, messages, max_tokens=CONTENT_MAX_TOKENS, temperature=0.75
+        )
+    if truncated:
+        print(f"   ⚠️  Post cortado mesmo com {CONTENT_MAX_TOKENS} tokens — marcado no PR")
+    return content, truncated
 
-Sem frontmatter, sem `---`, sem bloco de metadados."""
 
-    # FIX: era client.chat_completion() — API antiga e removida
-    resp = client.chat.completions.create(
-        model=MODEL_ID,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=CONTENT_MAX_TOKENS,
+# ─────────────────────────────────────────────────────────────
+# 2+3. TEMA E CONTEÚDO NUMA CHAMADA SÓ
+# ─────────────────────────────────────────────────────────────
+
+def generate_topic_and_post(posts: list, client: InferenceClient, on_topic=None) -> tuple:
+    """Escolhe o tema e escreve o post numa única chamada ao LLM.
+
+    Retorna (topic, content); qualquer um dos dois vem None se a resposta
+    não estiver no formato esperado, e o conteúdo vem None também se o
+    modelo bateu em max_tokens — o main completa o que faltar com o
+    fluxo de duas chamadas. `on_topic(topic)` é chamado assim que o JSON do
+    tema chega no stream, antes do corpo do post."""
+    topics_list = "\n".join(
+        f"- [{p['dirname']}] {p['title']}"
+        for p in posts
+    ) or "Nenhum post publicado ainda."
+
+    user = f"""## Posts já publicados:
+{topics_list}"""
+
+    notified = False
+
+    def until(partial: str) -> bool:
+        nonlocal notified
+        if FUSED_POST_MARKER not in partial:
+            return False
+        topic, _ = _split_fused(partial)
+        if topic and on_topic:
+            on_topic(topic)
+            notified = True
+        return True
+
+    raw, truncated = stream_completion(
+        client,
+        build_messages(FUSED_TASK, user),
+        max_tokens=THEME_MAX_TOKENS + estimate_content_max_tokens(posts),
         temperature=0.75,
+        until=until,
+        validate=_validate_fused,
     )
-    return resp.choices[0].message.content.strip()
+    topic, content = _split_fused(raw)
+    if topic and on_topic and not notified:
+        on_topic(topic)
+    if truncated:
+        print("   ⚠️  Resposta cortada no limite de tokens, o post vai ser gerado à parte")
+        content = None
+    return topic, content
+
+
+_FUSED_SPLIT = re.compile(rf"^[ \t]*(?:{FUSED_JSON_MARKER}|{FUSED_POST_MARKER})[ \t]*$", re.M)
+
+
+def _split_fused(raw: str) -> tuple:
+    parts = _FUSED_SPLIT.split(raw)
+    if len(parts) != 3:
+        return None, None
+    try:
+        topic = parse_topic(parts[1])
+    except ValueError:
+        topic = None
+    return topic, _strip_wrapping_fence(parts[2]) or None
+
+
+def _validate_fused(raw: str):
+    """Só vale cachear a resposta única se ela trouxer tema e post."""
+    topic, content = _split_fused(raw)
+    if topic is None or content is None:
+        raise ValueError("resposta fora do formato de duas seções")
+
+
+_FENCE_LINE     = re.compile(r"^```[\w-]*[ \t]*$", re.M)
+_FENCE_MD_START = re.compile(r"\A```(?:markdown|md)?[ \t]*\n")
+_FENCE_END      = re.compile(r"\n```[ \t]*\Z")
+
+
+def _strip_wrapping_fence(content: str) -> str:
+    """Remove a cerca de código que sobra quando o modelo embrulha a resposta
+    inteira em ```: a de abertura (```markdown no começo do post) e/ou a de
+    fechamento, que só é removida se estiver sem par — um post pode terminar
+    legitimamente num bloco de código."""
+    content = content.strip()
+    if m := _FENCE_MD_START.match(content):
+        content = _FENCE_END.sub("", content[m.end():]).strip()
+    elif len(_FENCE_LINE.findall(content)) % 2:
+        content = _FENCE_END.sub("", content).strip()
+    return content
 
 
 # ─────────────────────────────────────────────────────────────
 # 4. ATUALIZAR ÍNDICE NO README DA RAIZ  ← NOVO
 # ─────────────────────────────────────────────────────────────
 
-def update_readme_index(repo, branch: str, dirname: str, topic: dict, post_number: int):
+def update_readme_index(current: str, dirname: str, topic: dict, post_number: int) -> str:
     """Insere o novo post no topo da seção '## Últimos posts:' do README.md."""
-    readme_file = repo.get_contents(README_PATH, ref=branch)
-    current = readme_file.decoded_content.decode("utf-8")
-
     new_entry  = f"- [{post_number:04d} - {topic['title']}](./posts/{dirname})\n"
     # Busca a seção seguida de linha em branco (padrão atual do README)
     marker     = f"{POSTS_SECTION}\n\n"
 
     if marker in current:
         # Insere no topo da lista, mantendo a linha em branco após o título da seção
-        updated = current.replace(marker, f"{marker}{new_entry}", 1)
-    else:
-        # Fallback: seção não existe, cria ao final
-        updated = current.rstrip() + f"\n\n{POSTS_SECTION}\n\n{new_entry}"
-
-    repo.update_file(
-        path=README_PATH,
-        message=f"docs(index): add link to post {dirname}",
-        content=updated,
-        sha=readme_file.sha,
-        branch=branch,
-    )
-    print(f"  📋 README.md atualizado com link para {dirname}")
+        return current.replace(marker, f"{marker}{new_entry}", 1)
+    # Fallback: seção não existe, cria ao final
+    return current.rstrip() + f"\n\n{POSTS_SECTION}\n\n{new_entry}"
 
 
 # ─────────────────────────────────────────────────────────────
 # 5. CRIAR BRANCH + ARQUIVOS + PULL REQUEST
 # ─────────────────────────────────────────────────────────────
 
-def create_pull_request(repo, post_number: int, topic: dict, content: str) -> str:
-    dirname   = f"{post_number:04d}-{topic['slug']}"
+def prepare_pull_request(repo, post_number: int, topic: dict) -> dict:
+    """Tudo o que o PR precisa e não depende do conteúdo do post: commit base,
+    nome da branch e README com o índice atualizado. Só depende do tema, então
+    o main roda isso em paralelo com a geração do conteúdo."""
+    dirname = f"{post_number:04d}-{topic['slug']}"
+    now     = datetime.now()
+    base    = repo.get_branch(MAIN_BRANCH).commit.commit
+    readme  = repo.get_contents(README_PATH, ref=base.sha)
+    return {
+        "branch":   f"agent/post-{now.strftime('%Y%m%d')}-{topic['slug']}",
+        "today_br": now.strftime("%d/%m/%Y"),
+        "dirname":  dirname,
+        "base":     base,
+        "readme":   update_readme_index(
+            readme.decoded_content.decode("utf-8"), dirname, topic, post_number
+        ),
+    }
+
+
+def create_pull_request(repo, post_number: int, topic: dict, content: str, prepared: dict = None,
+                        truncated: bool = False) -> str:
+    from github import InputGitTreeElement
+
+    prepared  = prepared or prepare_pull_request(repo, post_number, topic)
+    dirname   = prepared["dirname"]
+    branch    = prepared["branch"]
+    base      = prepared["base"]
     file_path = f"{POSTS_DIR}/{dirname}/{POST_FILENAME}"
-    branch    = f"agent/post-{datetime.now().strftime('%Y%m%d')}-{topic['slug']}"
-    today_br  = datetime.now().strftime("%d/%m/%Y")
-
-    base_sha = repo.get_branch(MAIN_BRANCH).commit.sha
-    repo.create_git_ref(ref=f"refs/heads/{branch}", sha=base_sha)
-    print(f"  🌿 Branch criada: {branch}")
-
-    # Commit 1: arquivo do novo post
-    repo.create_file(
-        path=file_path,
-        message=f"feat(blog): add post {dirname}",
-        content=content,
-        branch=branch,
+    today_br  = prepared["today_br"]
+
+    # Post + índice do README num commit só, via Git Data API: árvore nova
+    # sobre a da base, commit e ref — sem os round-trips escondidos de
+    # create_file/update_file (um commit e um update de ref por arquivo)
+    tree = repo.create_git_tree(
+        [
+            InputGitTreeElement(file_path, "100644", "blob", content=content),
+            InputGitTreeElement(README_PATH, "100644", "blob", content=prepared["readme"]),
+        ],
+        base_tree=base.tree,
     )
+    commit = repo.create_git_commit(f"feat(blog): add post {dirname}", tree, [base])
+    repo.create_git_ref(ref=f"refs/heads/{branch}", sha=commit.sha)
+    print(f"  🌿 Branch criada: {branch}")
     print(f"  📄 Arquivo criado: {file_path}")
+    print(f"  📋 README.md atualizado com link para {dirname}")
 
-    # Commit 2: atualização do índice no README da raiz
-    update_readme_index(repo, branch, dirname, topic, post_number)
+    truncated_note = f"""
+> ❗ **Post truncado:** o modelo parou no limite de {CONTENT_MAX_TOKENS} tokens.
+> O final do post precisa ser completado à mão.
+"""
 
     pr_body = f"""## 🤖 Post gerado automaticamente pelo Blog Agent
 
@@ -255,7 +670,7 @@ def create_pull_request(repo, post_number: int, topic: dict, content: str) -> st
 
 ### 📝 Descrição
 {topic['description']}
-
+{truncated_note if truncated else ""}
 ---
 > ⚠️ **Revisão obrigatória antes do merge:**
 > - [ ] Precisão técnica do conteúdo Rust
@@ -279,30 +694,65 @@ def create_pull_request(repo, post_number: int, topic: dict, content: str) -> st
 # ─────────────────────────────────────────────────────────────
 
 def main():
+    global LLM_CACHE_ENABLED
+    parser = argparse.ArgumentParser(description="Gera um post novo e abre o PR.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignora o cache de respostas do LLM")
+    if parser.parse_args().no_cache:
+        LLM_CACHE_ENABLED = False
+
     print("🚀 Blog Agent iniciando...\n")
 
-    g    = Github(GITHUB_TOKEN)
+    from github import Github
+    from huggingface_hub import InferenceClient
+
+    # pool_size: as leituras em paralelo (fallback de _read_title e o preparo
+    # do PR em background) reaproveitam conexões em vez de abrir novas
+    g    = Github(GITHUB_TOKEN, per_page=100, pool_size=FETCH_WORKERS)
     repo = g.get_repo(REPO_NAME)
     print(f"✅ GitHub: {repo.full_name}")
 
-    client = InferenceClient(api_key=HF_TOKEN)
+    # Um único client para todas as chamadas: reaproveita a conexão
+    client = InferenceClient(api_key=HF_TOKEN, timeout=HTTP_TIMEOUT)
     print(f"✅ HF Inference API: {MODEL_ID}\n")
 
     print("📚 Lendo posts existentes...")
-    posts = get_existing_posts(repo)
+    posts, dirnames = get_existing_posts(repo)
     print(f"   {len(posts)} post(s) encontrado(s)\n")
 
-    print("🤔 Escolhendo próximo tema...")
-    topic = choose_next_topic(posts, client)
-    print(f"   ✅ Tema: {topic['title']}\n")
+    number = get_next_number(dirnames)
+
+    # O preparo do PR só depende do tema: roda numa thread enquanto o LLM
+    # ainda escreve o post, e o main só espera por ele antes do commit.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        prepare_job = None
+
+        def start_prepare(topic: dict):
+            nonlocal prepare_job
+            prepare_job = pool.submit(prepare_pull_request, repo, number, topic)
+
+        print("🤔 Escolhendo tema e gerando conteúdo (chamada única)...")
+        topic, content = generate_topic_and_post(posts, client, on_topic=start_prepare)
+
+        if topic is None:
+            print("   ⚠️  Tema fora do formato, voltando para duas chamadas\n")
+            print("🤔 Escolhendo próximo tema...")
+            topic = choose_next_topic(posts, client)
+            start_prepare(topic)
+            # O conteúdo que veio junto foi escrito para outro tema
+            content = None
+        print(f"   ✅ Tema: {topic['title']}\n")
+
+        truncated = False
+        if content is None:
+            print("✍️  Gerando conteúdo do post...")
+            content, truncated = generate_post_content(topic, posts, client)
+        print(f"   ✅ {len(content)} caracteres gerados\n")
 
-    print("✍️  Gerando conteúdo do post...")
-    content = generate_post_content(topic, posts, client)
-    print(f"   ✅ {len(content)} caracteres gerados\n")
+        prepared = prepare_job.result()
 
-    number = get_next_number(posts)
     print(f"📬 Criando PR para o post #{number:04d}...")
-    pr_url = create_pull_request(repo, number, topic, content)
+    pr_url = create_pull_request(repo, number, topic, content, prepared, truncated)
 
     print(f"\n🎉 Concluído! PR disponível em:\n   {pr_url}")
 
@@ -5,8 +5,11 @@ e publica o feedback como comentário no PR.
 """
 
 import os, re
-from github import Github
-from huggingface_hub import InferenceClient
+import threading
+from concurrent.futures import Future
+
+# github, huggingface_hub e tokenizers são importados dentro das funções:
+# custam centenas de ms no cold start e nem sempre são usados
 
 GITHUB_TOKEN       = os.environ.get("GH_PAT") or os.environ["GITHUB_TOKEN"]
 HF_TOKEN           = os.environ["HF_TOKEN"]
@@ -14,18 +17,25 @@ REPO_NAME          = os.environ["GITHUB_REPOSITORY"]
 PR_NUMBER          = int(os.environ["PR_NUMBER"])
 MODEL_ID           = os.environ.get("MODEL_ID") or "deepseek-ai/DeepSeek-V3-0324"  # mesmo do agente
 
+# Orçamento total da chamada (prompt + post + revisão), em tokens. Nome
+# próprio: no blog_agent, CONTENT_MAX_TOKENS é o limite de geração do post.
 try:
-    CONTENT_MAX_TOKENS = int(os.environ.get("CONTENT_MAX_TOKENS")) or 8192
+    REVIEW_CONTEXT_TOKENS = int(os.environ.get("REVIEW_CONTEXT_TOKENS", "8192"))
 except ValueError:
-    CONTENT_MAX_TOKENS = 8192
+    REVIEW_CONTEXT_TOKENS = 8192
+
+# Uma revisão completa cabe folgada em 2048 tokens; decode é linear no tamanho
+try:
+    REVIEW_MAX_TOKENS = int(os.environ.get("REVIEW_MAX_TOKENS", "2048"))
+except ValueError:
+    REVIEW_MAX_TOKENS = 2048
+
+CHAT_TEMPLATE_MARGIN = 32  # tokens do chat template (papéis, separadores)
 
 REVIEW_PROMPT = """
 Você é um revisor técnico especializado em Rust e Python.
-Revise o post abaixo destinado ao blog 'Desbravando Rust', voltado para
-programadores Python que estão aprendendo Rust.
-
-## Post para revisar:
-{content}
+Revise o post enviado pelo usuário, destinado ao blog 'Desbravando Rust',
+voltado para programadores Python que estão aprendendo Rust.
 
 ## O que avaliar e corrigir:
 
@@ -51,8 +61,9 @@ programadores Python que estão aprendendo Rust.
 ## Formato da revisão:
 Estruture sua resposta em seções com os títulos acima.
 Para cada problema encontrado, cite o trecho específico e sugira a correção.
-Seja objetivo e construtivo. Ao final, dê uma nota geral de 1 a 10.
-"""
+Seja objetivo e construtivo. Ao final, dê uma nota geral de 1 a 10
+numa linha no formato "Nota geral: N/10".
+""".strip()
 
 
 def get_post_content(repo, pr) -> tuple[str, str]:
@@ -65,6 +76,54 @@ def get_post_content(repo, pr) -> tuple[str, str]:
     return "", ""
 
 
+def load_tokenizer():
+    """Tokenizer do MODEL_ID (tokenizer.json no Hub), ou None se a lib não
+    estiver instalada ou o modelo não publicar um — aí a contagem é estimada."""
+    try:
+        from tokenizers import Tokenizer  # opcional: contagem exata de tokens
+    except ImportError:
+        return None
+    try:
+        return Tokenizer.from_pretrained(MODEL_ID, token=HF_TOKEN)
+    except Exception as e:
+        print(f"   ⚠️  Tokenizer indisponível ({e}); estimando ~4 caracteres por token")
+        return None
+
+
+def count_tokens(text: str, tokenizer) -> int:
+    if tokenizer is None:
+        return len(text) // 4
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, tokenizer) -> str:
+    """Corta o texto em no máximo max_tokens tokens, sem reescrevê-lo: os
+    offsets do tokenizer apontam onde o último token cabível termina."""
+    if max_tokens <= 0:
+        return ""
+    if tokenizer is None:
+        return text[:max_tokens * 4]
+    enc = tokenizer.encode(text, add_special_tokens=False)
+    if len(enc.ids) <= max_tokens:
+        return text
+    return text[:enc.offsets[max_tokens - 1][1]]
+
+
+def in_background(fn) -> Future:
+    """Roda fn numa thread daemon: se o main sair antes de precisar do
+    resultado (ex.: PR sem post), o interpretador não espera por ela."""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
 def post_review_comment(pr, filepath: str, review: str):
     """Publica o review como comentário no PR."""
     comment = f"""## 🤖 Revisão Automática do Post
@@ -84,6 +143,13 @@ def post_review_comment(pr, filepath: str, review: str):
 def main():
     print("🔍 PR Reviewer iniciando...\n")
 
+    # O tokenizer (alguns MB baixados do Hub) carrega numa thread enquanto o
+    # PR é lido do GitHub: as duas esperas de rede se sobrepõem
+    tokenizer_job = in_background(load_tokenizer)
+
+    from github import Github
+    from huggingface_hub import InferenceClient
+
     g    = Github(GITHUB_TOKEN)
     repo = g.get_repo(REPO_NAME)
     pr   = repo.get_pull(PR_NUMBER)
@@ -99,14 +165,28 @@ def main():
 
     # 2. Enviar para o LLM revisar
     print("🤔 Enviando para revisão pelo LLM...")
-    client = InferenceClient(api_key=HF_TOKEN)
+    client = InferenceClient(api_key=HF_TOKEN, timeout=60)
+    tokenizer = tokenizer_job.result()
+    header = "## Post para revisar:\n"
+    # O post fica com o que sobra do orçamento depois do prompt fixo e da resposta
+    budget = (
+        REVIEW_CONTEXT_TOKENS
+        - count_tokens(REVIEW_PROMPT + header, tokenizer)
+        - REVIEW_MAX_TOKENS
+        - CHAT_TEMPLATE_MARGIN
+    )
+    post = truncate_to_tokens(content, budget, tokenizer)
+    if len(post) < len(content):
+        print(f"   ✂️  Post truncado em {budget} tokens ({len(post)} de {len(content)} caracteres)")
     resp = client.chat.completions.create(
         model=MODEL_ID,
-        messages=[{
-            "role": "user",
-            "content": REVIEW_PROMPT.format(content=content[:12000])
-        }],
-        max_tokens=8192,
+        # Instruções fixas no system (prefixo idêntico entre PRs, cacheável
+        # pelo provedor); só o post muda, no user.
+        messages=[
+            {"role": "system", "content": REVIEW_PROMPT},
+            {"role": "user", "content": header + post},
+        ],
+        max_tokens=REVIEW_MAX_TOKENS,
         temperature=0.3,  # baixo para revisão mais objetiva
     )
     review = resp.choices[0].message.content.strip()
@@ -0,0 +1,217 @@
+import contextlib
+import os
+import tempfile
+from types import SimpleNamespace as NS
+
+# blog_agent lê essas variáveis ao importar; os parsers testados não as usam
+for _var in ("GITHUB_TOKEN", "HF_TOKEN", "GITHUB_REPOSITORY"):
+    os.environ.setdefault(_var, "teste")
+# Nunca lê nem escreve no cache de verdade (~/.cache/blog_agent)
+os.environ["BLOG_AGENT_CACHE_DIR"] = tempfile.mkdtemp()
+
+import blog_agent
+from blog_agent import (
+    _llm_cache_path, _split_fused, choose_next_topic, generate_post_content,
+    generate_topic_and_post, get_existing_posts, get_next_number, parse_topic, stream_completion,
+)
+
+TOPIC = '{"title": "T", "slug": "s", "description": "d", "tags": ["a"], "outline": []}'
+RESP = f"""---FRONTMATTER_JSON---
+{TOPIC}
+---POST_MARKDOWN---
+# T
+
+texto
+
+---
+
+```rust
+fn main() {{}}
+```
+"""
+
+def test_split_fused_resposta_valida():
+    topic, content = _split_fused(RESP)
+    assert topic["slug"] == "s"
+    assert content.startswith("# T")
+    assert content.endswith("```")  # bloco de código legítimo no fim fica
+    assert "\n---\n" in content     # régua horizontal no post não quebra o split
+
+def test_split_fused_sem_marcador():
+    assert _split_fused("# Só o post\n\ntexto") == (None, None)
+
+def test_split_fused_json_invalido_mantem_so_o_conteudo():
+    topic, content = _split_fused('---FRONTMATTER_JSON---\n{"title": \n---POST_MARKDOWN---\n# X\n')
+    assert topic is None
+    assert content == "# X"
+
+def test_split_fused_json_sem_campos_obrigatorios():
+    topic, _ = _split_fused('---FRONTMATTER_JSON---\n{"title": "T"}\n---POST_MARKDOWN---\n# T\n')
+    assert topic is None
+
+def test_split_fused_resposta_inteira_em_cerca():
+    topic, content = _split_fused(f"```\n{RESP}```")
+    assert topic["title"] == "T"
+    assert not content.endswith("```\n```")
+    assert content.endswith("fn main() {}\n```")
+
+def test_split_fused_post_em_cerca_markdown():
+    _, content = _split_fused(f"---FRONTMATTER_JSON---\n{TOPIC}\n---POST_MARKDOWN---\n```markdown\n# T\nbody\n```\n")
+    assert content == "# T\nbody"
+
+def test_split_fused_json_em_cerca():
+    topic, _ = _split_fused(f"---FRONTMATTER_JSON---\n```json\n{TOPIC}\n```\n---POST_MARKDOWN---\n# T\n")
+    assert topic["slug"] == "s"
+
+class FakeClient:
+    """Client do HF que devolve, em ordem, (texto, finish_reason) por chamada."""
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.chat = NS(completions=NS(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        text, finish = self.replies.pop(0)
+        return iter([NS(choices=[NS(delta=NS(content=text), finish_reason=None)]),
+                     NS(choices=[NS(delta=NS(content=None), finish_reason=finish)])])
+
+def fresh_llm_cache():
+    blog_agent.LLM_CACHE_DIR = tempfile.mkdtemp()
+
+POST_TOPIC = {"title": "T", "slug": "s", "description": "d", "tags": ["a"]}
+
+def test_post_truncado_gera_de_novo_com_teto_cheio():
+    fresh_llm_cache()
+    client = FakeClient(("# T\ncorta", "length"), ("# T\ninteiro", "stop"))
+    content, truncated = generate_post_content(POST_TOPIC, [{"title": "x", "size": 400}], client)
+    assert (content, truncated) == ("# T\ninteiro", False)
+    assert client.calls[0]["max_tokens"] < client.calls[1]["max_tokens"] == blog_agent.CONTENT_MAX_TOKENS
+
+def test_post_truncado_no_teto_cheio_fica_marcado():
+    fresh_llm_cache()
+    client = FakeClient(("# T\ncorta", "length"))
+    content, truncated = generate_post_content(POST_TOPIC, [], client)
+    assert truncated and content == "# T\ncorta"
+    assert len(client.calls) == 1
+
+def test_parse_topic_exige_campos_obrigatorios():
+    for raw in ('{"title": "x"}', '["x"]', '{"title": "T", "slug": "", "description": "d", "tags": ["a"]}'):
+        try:
+            parse_topic(raw)
+        except ValueError:
+            continue
+        raise AssertionError(f"aceitou {raw}")
+    assert parse_topic(f"```json\n{TOPIC}\n```")["slug"] == "s"
+
+def test_tema_sem_campos_nao_entra_no_cache():
+    fresh_llm_cache()
+    client = FakeClient(('{"title": "x"}', "stop"), (TOPIC, "stop"))
+    try:
+        choose_next_topic([], client)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("tema incompleto passou")
+    # A segunda execução vai ao modelo de novo em vez de servir o tema quebrado
+    assert choose_next_topic([], client)["slug"] == "s"
+    assert len(client.calls) == 2
+
+def test_chamada_unica_valida_e_cacheada():
+    fresh_llm_cache()
+    client = FakeClient((RESP, "stop"))
+    first = generate_topic_and_post([], client)
+    assert generate_topic_and_post([], client) == first
+    assert len(client.calls) == 1
+
+def test_chamada_unica_truncada_nao_e_cacheada():
+    fresh_llm_cache()
+    client = FakeClient((RESP, "length"), (RESP, "stop"))
+    topic, content = generate_topic_and_post([], client)
+    assert topic["slug"] == "s" and content is None
+    assert generate_topic_and_post([], client)[1].startswith("# T")
+    assert len(client.calls) == 2
+
+def test_stream_completion_resposta_invalida_nao_entra_nem_sai_do_cache():
+    fresh_llm_cache()
+    messages = [{"role": "user", "content": "x"}]
+    path = _llm_cache_path(messages, 10, 0.7)
+    blog_agent._llm_cache_put(path, "quebrado")
+
+    def validate(text):
+        if text != "ok":
+            raise ValueError(text)
+
+    client = FakeClient(("quebrado de novo", "stop"))
+    assert stream_completion(client, messages, 10, 0.7, validate=validate) == ("quebrado de novo", False)
+    assert len(client.calls) == 1  # o "quebrado" do cache não foi servido
+    assert blog_agent._llm_cache_get(path) == "quebrado"  # nem sobrescrito
+
+def test_get_next_number_usa_o_ultimo_diretorio_numerado():
+    assert get_next_number(["0001-intro", "0009-traits", "0010-lifetimes", "notas", "rascunhos"]) == 11
+    assert get_next_number(["0003-x", "intro"]) == 4
+    assert get_next_number(["notas"]) == 1
+    assert get_next_number([]) == 1
+
+class FakeRepo:
+    full_name = "dono/blog"
+
+    def __init__(self, head, readmes):
+        self.head = head
+        self.readmes = readmes  # {dirname: blob_sha}
+        self.tree_calls = 0
+
+    def get_branch(self, name):
+        return NS(commit=NS(sha=self.head))
+
+    def get_git_tree(self, sha, recursive=False):
+        self.tree_calls += 1
+        return NS(tree=[
+            NS(path=f"posts/{d}/README.md", type="blob", sha=blob, size=400)
+            for d, blob in self.readmes.items()
+        ])
+
+def test_cache_de_posts_nao_fecha_o_commit_com_readme_faltando():
+    blog_agent.CACHE_DIR = tempfile.mkdtemp()
+    blog_agent.POSTS_CACHE_FILE = os.path.join(blog_agent.CACHE_DIR, "posts.json")
+    blog_agent.make_session = lambda: contextlib.nullcontext()
+    read = []
+    fail = {"0002-b"}
+
+    def fake_read_title(session, repo, ref, path, dirname):
+        read.append(dirname)
+        return None if dirname in fail else {"dirname": dirname, "title": dirname.upper()}
+
+    blog_agent._read_title = fake_read_title
+    repo = FakeRepo("c1", {"0001-a": "b1", "0002-b": "b2"})
+
+    posts, dirnames = get_existing_posts(repo)
+    assert [p["dirname"] for p in posts] == ["0001-a"]
+    assert dirnames == ["0001-a", "0002-b"]  # a numeração conta o que falhou
+    assert "commit" not in blog_agent._load_posts_cache()
+
+    # Mesmo commit: relista, mas só baixa o README que faltou
+    fail.clear(); read.clear()
+    posts, _ = get_existing_posts(repo)
+    assert read == ["0002-b"]
+    assert [p["title"] for p in posts] == ["0001-A", "0002-B"]
+    assert blog_agent._load_posts_cache()["commit"] == "c1"
+
+    # Agora completo: nem a árvore é listada de novo
+    read.clear()
+    assert get_existing_posts(repo)[0] == posts
+    assert repo.tree_calls == 2 and read == []
+
+    # Commit novo com um blob alterado: só ele é baixado
+    repo.head, repo.readmes["0001-a"] = "c2", "b1-novo"
+    get_existing_posts(repo)
+    assert read == ["0001-a"]
+
+if __name__ == "__main__":
+    import sys
+    n = 0
+    for name, fn in sorted(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn(); n += 1; print("ok:", name)
+    print(f"\n{n} testes passaram")
+    sys.exit(0)